@@ -3,18 +3,57 @@ Data Processor for Scholarship DSS
 Handles dataset loading, enhancement, and preprocessing
 """
 
+import hashlib
+import os
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
+
+# On-disk cache for processed frames, see load_and_preprocess_cached
+# Bump CACHE_VERSION whenever enhancement or preprocessing output changes
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dss')
+CACHE_VERSION = 7
+CACHE_MAX_ENTRIES = 16
 
 class ScholarshipDataProcessor:
     """
     Processes and enhances student performance data for scholarship decisions
     """
     
+    # Column types of StudentPerformance.csv, parsed by the pyarrow engine
+    # Only these columns are read, in the narrowest type holding their range;
+    # Arrow-backed integers stay nullable so blank cells still parse
+    CSV_DTYPES = {
+        'Hours Studied': 'int16[pyarrow]',
+        'Previous Scores': 'int16[pyarrow]',
+        'Extracurricular Activities': pd.CategoricalDtype(['No', 'Yes']),
+        'Sleep Hours': 'int8[pyarrow]',
+        'Sample Question Papers Practiced': 'int8[pyarrow]',
+        'Performance Index': 'float32'
+    }
+    
+    # Category order of each encoded column, position = encoded value
+    CATEGORICAL_MAPPINGS = {
+        'Extracurricular Activities': ['No', 'Yes'],
+        'parent_education': ['High School', 'Undergraduate', 'Postgraduate'],
+        'previous_scholarship': ['No', 'Yes']
+    }
+    
+    # Human-readable feature explanations, see get_feature_explanation
+    _EXPLANATIONS = {
+        'Performance Index': 'Overall academic performance (0-100)',
+        'Previous Scores': 'Historical academic achievement (0-100)',
+        'family_income': 'Annual family income (lower = higher need)',
+        'parent_education': 'Highest education level of parents',
+        'attendance_percentage': 'Class attendance rate (60-100%)',
+        'Extracurricular Activities': 'Participation in extracurriculars',
+        'previous_scholarship': 'Previously received scholarship assistance'
+    }
+    
     def __init__(self):
-        self.scaler = MinMaxScaler()
         self.categorical_mappings = {}
+        # (min, max) family income of the last enhanced frame
+        self._income_minmax = None
         
     def load_and_enhance_data(self, filepath):
         """
@@ -27,122 +66,265 @@ class ScholarshipDataProcessor:
             Enhanced DataFrame
         """
         # Load original data
-        df = pd.read_csv(filepath)
+        df = pd.read_csv(
+            filepath,
+            engine='pyarrow',
+            dtype_backend='pyarrow',
+            dtype=self.CSV_DTYPES,
+            usecols=list(self.CSV_DTYPES)
+        )
         
-        # Set random seed for reproducibility
-        np.random.seed(42)
+        # Seeded generator for reproducibility
+        rng = np.random.default_rng(42)
         n = len(df)
         
         # 1. Family Income (realistic distribution)
-        # Using log-normal distribution for realistic income spread
-        income_base = np.random.lognormal(mean=10.5, sigma=0.8, size=n)
-        df['family_income'] = (income_base * 5000).astype(int)
-        # Clip to reasonable range
-        df['family_income'] = df['family_income'].clip(15000, 200000)
+        # Using log-normal distribution for realistic income spread,
+        # clipped to a reasonable range before the integer cast
+        income_base = rng.lognormal(mean=10.5, sigma=0.8, size=n)
+        df['family_income'] = np.clip(income_base * 5000, 15000, 200000).astype(np.int32)
         
         # 2. Parent Education (weighted distribution)
         education_choices = ['High School', 'Undergraduate', 'Postgraduate']
         education_weights = [0.4, 0.4, 0.2]  # Realistic distribution
-        df['parent_education'] = np.random.choice(
-            education_choices, 
-            size=n, 
-            p=education_weights
+        # Stored as an ordered categorical so encoding is a codes lookup
+        df['parent_education'] = pd.Categorical(
+            rng.choice(education_choices, size=n, p=education_weights),
+            categories=education_choices,
+            ordered=True
         )
         
         # 3. Attendance Percentage (correlated with performance)
         # Students with better performance tend to have better attendance
-        base_attendance = np.random.normal(80, 10, size=n)
-        performance_boost = (df['Performance Index'] / 100) * 15
-        df['attendance_percentage'] = (base_attendance + performance_boost).clip(60, 100)
-        df['attendance_percentage'] = df['attendance_percentage'].round(1)
+        # Performance boost is up to 15 points, i.e. PI / 100 * 15
+        base_attendance = rng.normal(80, 10, size=n)
+        performance_boost = df['Performance Index'].to_numpy() * 0.15
+        df['attendance_percentage'] = np.round(
+            np.clip(base_attendance + performance_boost, 60, 100), 1
+        )
         
         # 4. Previous Scholarship (inversely correlated with income)
         # Lower income students more likely to have had previous scholarship
-        income_normalized = (df['family_income'] - df['family_income'].min()) / \
-                           (df['family_income'].max() - df['family_income'].min())
+        income_min, income_max = df['family_income'].min(), df['family_income'].max()
+        self._income_minmax = (income_min, income_max)
+        income_normalized = (df['family_income'] - income_min) / (income_max - income_min)
         scholarship_prob = 1 - income_normalized * 0.7  # 30% base, up to 100%
-        df['previous_scholarship'] = np.random.random(n) < scholarship_prob
-        df['previous_scholarship'] = df['previous_scholarship'].map({True: 'Yes', False: 'No'})
+        had_scholarship = rng.random(n) < scholarship_prob.to_numpy()
+        df['previous_scholarship'] = pd.Categorical(
+            np.where(had_scholarship, 'Yes', 'No'),
+            categories=['No', 'Yes']
+        )
         
         return df
     
-    def preprocess_data(self, df):
+    def enhance_and_preprocess(self, filepath):
+        """
+        Load, enhance and preprocess a CSV in one go
+        
+        Reuses the family income range found while enhancing instead of
+        scanning the column again during preprocessing. Paths go through
+        the on-disk cache (see load_and_preprocess_cached), file-like
+        objects such as uploads are always processed
+        
+        Args:
+            filepath: Path to StudentPerformance.csv, or a file-like object
+            
+        Returns:
+            Processed DataFrame with normalized scores
+        """
+        if isinstance(filepath, (str, os.PathLike)):
+            return self.load_and_preprocess_cached(filepath)
+        
+        return self._enhance_and_preprocess(filepath)
+    
+    def _enhance_and_preprocess(self, filepath):
+        """
+        Uncached body of enhance_and_preprocess
+        """
+        df = self.load_and_enhance_data(filepath)
+        return self.preprocess_data(df, income_range=self._income_minmax)
+    
+    def preprocess_data(self, df, income_range=None):
         """
         Prepare data for DSS scoring with transparent transformations
         
+        Adds the encoded and normalized columns to `df` in place rather
+        than copying the whole frame
+        
         Args:
             df: Enhanced DataFrame
+            income_range: Known (min, max) of family_income, computed
+                from `df` when not given
             
         Returns:
-            Processed DataFrame with normalized scores
+            The same DataFrame, with normalized scores added
         """
-        df_processed = df.copy()
+        df_processed = df
         
         # Encode categorical variables (transparent mapping)
         # Extracurricular Activities
-        df_processed['extracurricular_score'] = df_processed['Extracurricular Activities'].map({
-            'Yes': 1.0,
-            'No': 0.0
-        })
-        
-        # Parent Education (ordinal encoding)
-        education_map = {
-            'High School': 1,
-            'Undergraduate': 2,
-            'Postgraduate': 3
-        }
-        df_processed['parent_education_score'] = df_processed['parent_education'].map(education_map)
-        self.categorical_mappings['parent_education'] = education_map
+        extracurricular_categories = self.CATEGORICAL_MAPPINGS['Extracurricular Activities']
+        df_processed['extracurricular_score'] = self._encode_categorical(
+            df_processed['Extracurricular Activities'], extracurricular_categories
+        )
+        self.categorical_mappings['Extracurricular Activities'] = list(extracurricular_categories)
+        
+        # Parent Education (ordinal encoding, 1-3)
+        education_categories = self.CATEGORICAL_MAPPINGS['parent_education']
+        df_processed['parent_education_score'] = self._encode_categorical(
+            df_processed['parent_education'], education_categories
+        ) + 1
+        self.categorical_mappings['parent_education'] = list(education_categories)
+        
+        # Inverted education score (lower education = higher need)
+        df_processed['parent_ed_need'] = (
+            100 - (df_processed['parent_education_score'] - 1) * 50
+        ).fillna(50).astype(np.float32)
         
         # Previous Scholarship
-        df_processed['previous_scholarship_score'] = df_processed['previous_scholarship'].map({
-            'Yes': 1.0,
-            'No': 0.0
-        })
+        scholarship_categories = self.CATEGORICAL_MAPPINGS['previous_scholarship']
+        df_processed['previous_scholarship_score'] = self._encode_categorical(
+            df_processed['previous_scholarship'], scholarship_categories
+        )
+        self.categorical_mappings['previous_scholarship'] = list(scholarship_categories)
         
         # Normalize numerical features (0-100 scale for interpretability)
+        if income_range is None and 'family_income' in df_processed.columns:
+            income_range = (df_processed['family_income'].min(), df_processed['family_income'].max())
+        
         numerical_features = {
             'Hours Studied': (0, 10),
             'Previous Scores': (0, 100),
             'Sleep Hours': (0, 10),
             'Sample Question Papers Practiced': (0, 10),
             'Performance Index': (0, 100),
-            'family_income': (df_processed['family_income'].min(), df_processed['family_income'].max()),
+            'family_income': income_range,
             'attendance_percentage': (60, 100),
             'parent_education_score': (1, 3)
         }
         
-        for feature, (min_val, max_val) in numerical_features.items():
-            if feature in df_processed.columns:
-                if max_val > min_val:
-                    df_processed[f'{feature}_normalized'] = (
-                        (df_processed[feature] - min_val) / (max_val - min_val) * 100
-                        ).clip(0, 100)
-                else:
-                    df_processed[f'{feature}_normalized'] = 50
-
+        # Normalize all present features in a single vectorized pass
+        features = [f for f in numerical_features if f in df_processed.columns]
+        bounds = np.array([numerical_features[f] for f in features], dtype=np.float32)
+        mins, spans = bounds[:, 0], bounds[:, 1] - bounds[:, 0]
+        X = df_processed[features].to_numpy(dtype=np.float32)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            X_normalized = np.clip((X - mins) / spans * 100, 0, 100)
+        # Constant features carry no information, score them neutrally
+        X_normalized[:, spans <= 0] = 50
+        df_processed[[f'{f}_normalized' for f in features]] = X_normalized
         
         # Invert income score (lower income = higher need score)
         # SAFE income need score 
         if 'family_income_normalized' in df_processed.columns:
             df_processed['income_need_score'] = 100 - df_processed['family_income_normalized']
         else:
-            df_processed['income_need_score'] = 50
+            df_processed['income_need_score'] = np.float32(50)
 
         
         return df_processed
     
+    def load_and_preprocess_cached(self, filepath, cache_dir=CACHE_DIR):
+        """
+        Load, enhance and preprocess a CSV, reusing earlier results from disk
+        
+        Both steps are deterministic for a given file (fixed seed), so the
+        processed frame is stored as Parquet keyed by the file path, its
+        modification time and CACHE_VERSION
+        
+        Args:
+            filepath: Path to StudentPerformance.csv
+            cache_dir: Directory holding cached frames
+            
+        Returns:
+            Processed DataFrame with normalized scores
+        """
+        cache_path = os.path.join(cache_dir, f"{self._cache_key(filepath)}.parquet")
+        
+        if os.path.exists(cache_path):
+            try:
+                df_processed = pd.read_parquet(cache_path, engine='pyarrow')
+                os.utime(cache_path)  # Mark as recently used
+            except (OSError, ValueError):
+                pass  # Unreadable entry, rebuild it below
+            else:
+                # Restore the state enhancing and preprocessing would have left
+                self.categorical_mappings.update(
+                    (col, list(categories)) for col, categories in self.CATEGORICAL_MAPPINGS.items()
+                )
+                self._income_minmax = (
+                    df_processed['family_income'].min(),
+                    df_processed['family_income'].max()
+                )
+                return df_processed
+        
+        df_processed = self._enhance_and_preprocess(filepath)
+        
+        # Caching is best effort, never fail the pipeline over it
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            df_processed.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            os.replace(tmp_path, cache_path)
+            self._evict_cache(cache_dir)
+        except Exception:
+            pass
+        finally:
+            # A failed write must not leave its partial file behind,
+            # _evict_cache only sees finished .parquet entries
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        
+        return df_processed
+    
+    @staticmethod
+    def _cache_key(filepath):
+        """
+        Cache key for a CSV path: changes when the file or the code changes
+        """
+        if not isinstance(filepath, (str, os.PathLike)):
+            raise TypeError(
+                f"Disk cache needs a file path, got {type(filepath).__name__}; "
+                "use enhance_and_preprocess for file-like objects"
+            )
+        filepath = os.path.abspath(filepath)
+        key = f"{filepath}|{os.path.getmtime(filepath)}|{CACHE_VERSION}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _evict_cache(cache_dir, max_entries=CACHE_MAX_ENTRIES):
+        """
+        Drop least recently used cache entries beyond max_entries
+        """
+        entries = [
+            e for e in os.scandir(cache_dir)
+            if e.is_file() and e.name.endswith('.parquet')
+        ]
+        entries.sort(key=lambda e: e.stat().st_atime, reverse=True)
+        for entry in entries[max_entries:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _encode_categorical(series, categories):
+        """
+        Encode a categorical column as its position in `categories`
+        
+        Unknown values are encoded as NaN rather than -1
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype) and list(series.cat.categories) == categories:
+            # Already encoded with the same categories, reuse the codes
+            codes = series.cat.codes.to_numpy()
+        else:
+            codes = pd.Categorical(series, categories=categories).codes
+        return np.where(codes >= 0, codes, np.nan).astype(np.float32)
+    
     def get_feature_explanation(self, feature_name):
         """
         Provide human-readable explanation of each feature
         """
-        explanations = {
-            'Performance Index': 'Overall academic performance (0-100)',
-            'Previous Scores': 'Historical academic achievement (0-100)',
-            'family_income': 'Annual family income (lower = higher need)',
-            'parent_education': 'Highest education level of parents',
-            'attendance_percentage': 'Class attendance rate (60-100%)',
-            'Extracurricular Activities': 'Participation in extracurriculars',
-            'previous_scholarship': 'Previously received scholarship assistance'
-        }
-        return explanations.get(feature_name, 'Feature score')
+        return self._EXPLANATIONS.get(feature_name, 'Feature score')
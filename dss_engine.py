@@ -12,6 +12,35 @@ class ScholarshipDSS:
     Uses transparent weighted scoring with explainable rules
     """
     
+    # Inputs of the fused score kernel, in score matrix row order
+    SCORE_INPUT_COLUMNS = [
+        'Performance Index_normalized',
+        'Previous Scores_normalized',
+        'income_need_score',
+        'parent_ed_need',
+        'attendance_percentage_normalized',
+        'extracurricular_score',
+        'Sample Question Papers Practiced_normalized'
+    ]
+    
+    # Explanation breakdown per category: score column, weight attribute and
+    # {component label: (column, display format or None for the raw value)}
+    EXPLANATION_BREAKDOWN = {
+        'Academic Merit': ('academic_score', 'academic_weight', {
+            'Performance Index': ('Performance Index', None),
+            'Previous Scores': ('Previous Scores', None)
+        }),
+        'Financial Need': ('financial_score', 'financial_weight', {
+            'Family Income': ('family_income', "${:,}"),
+            'Parent Education': ('parent_education', None)
+        }),
+        'Engagement': ('engagement_score', 'engagement_weight', {
+            'Attendance': ('attendance_percentage', "{}%"),
+            'Extracurriculars': ('Extracurricular Activities', None),
+            'Practice Papers': ('Sample Question Papers Practiced', None)
+        })
+    }
+    
     def __init__(self, 
                  academic_weight=0.40,
                  financial_weight=0.40, 
@@ -29,9 +58,34 @@ class ScholarshipDSS:
         if not np.isclose(total, 1.0):
             raise ValueError(f"Weights must sum to 1.0 (current: {total})")
         
-        self.academic_weight = academic_weight
-        self.financial_weight = financial_weight
-        self.engagement_weight = engagement_weight
+        # Scores are float32 end-to-end, keep weights in the same precision
+        self.academic_weight = np.float32(academic_weight)
+        self.financial_weight = np.float32(financial_weight)
+        self.engagement_weight = np.float32(engagement_weight)
+        
+        self._weight_vec = np.array(
+            [academic_weight, financial_weight, engagement_weight],
+            dtype=np.float32
+        )
+        self._score_matrix = self._build_score_matrix()
+        
+    def _build_score_matrix(self):
+        """
+        Build the (7, 3) matrix mapping SCORE_INPUT_COLUMNS to the
+        academic, financial and engagement scores
+        
+        Component weights mirror the calculate_*_score methods
+        """
+        W = np.zeros((len(self.SCORE_INPUT_COLUMNS), 3), dtype=np.float32)
+        W[0, 0] = 0.6        # Performance Index -> academic
+        W[1, 0] = 0.4        # Previous Scores -> academic
+        W[2, 1] = 0.7        # Income need -> financial
+        W[3, 1] = 0.3        # Parent education need -> financial
+        W[4, 2] = 0.5        # Attendance -> engagement
+        W[5, 2] = 0.3 * 100  # Extracurricular (0/1) -> engagement
+        W[6, 2] = 0.2        # Practice papers -> engagement
+        
+        return W
         
     def calculate_academic_score(self, df):
         """
@@ -68,12 +122,10 @@ class ScholarshipDSS:
         income_weight = 0.7
         education_weight = 0.3
         
-        # Invert parent education score (lower education = higher need)
-        parent_ed_need = 100 - ((df['parent_education_score'] - 1) / 2 * 100)
-        
+        # parent_ed_need is the inverted parent education score from preprocessing
         financial_score = (
             df['income_need_score'].fillna(50) * income_weight +
-            parent_ed_need.fillna(50) * education_weight
+            df['parent_ed_need'] * education_weight
             )
 
         
@@ -102,32 +154,60 @@ class ScholarshipDSS:
         
         return engagement_score
     
+    def calculate_all_scores(self, df):
+        """
+        Calculate all scores with a single matrix product
+        
+        Equivalent to the calculate_*_score methods combined with the
+        weighted final score, without the intermediate Series
+        
+        Returns:
+            float32 array of shape (n, 4) holding the academic, financial,
+            engagement and final scores
+        """
+        M = df[self.SCORE_INPUT_COLUMNS].to_numpy(dtype=np.float32)
+        
+        # Missing income counts as neutral need
+        income_need = M[:, 2]
+        income_need[np.isnan(income_need)] = 50
+        
+        # Any other missing input only invalidates the scores it feeds
+        missing = np.isnan(M)
+        M[missing] = 0
+        
+        scores = np.empty((len(M), 4), dtype=np.float32)
+        components = scores[:, :3]
+        np.matmul(M, self._score_matrix, out=components)
+        if missing.any():
+            components[missing @ (self._score_matrix != 0)] = np.nan
+        
+        # Final score is the weighted sum of the three category scores
+        np.matmul(components, self._weight_vec, out=scores[:, 3])
+        
+        return scores
+    
     def calculate_final_score(self, df):
         """
         Calculate final weighted scholarship score
         
+        Score columns are added to `df` in place rather than copying the
+        whole frame
+        
         Returns:
-            DataFrame with component scores and final score
+            The same DataFrame, with component scores and final score
         """
-        df_scored = df.copy()
-        
-        # Calculate component scores
-        df_scored['academic_score'] = self.calculate_academic_score(df)
-        df_scored['financial_score'] = self.calculate_financial_score(df)
-        df_scored['engagement_score'] = self.calculate_engagement_score(df)
+        df_scored = df
         
-        # Calculate weighted final score
-        df_scored['final_score'] = (
-            df_scored['academic_score'] * self.academic_weight +
-            df_scored['financial_score'] * self.financial_weight +
-            df_scored['engagement_score'] * self.engagement_weight
-        )
+        # Calculate component and weighted final scores in one pass
+        scores = self.calculate_all_scores(df)
         
         # Round for clarity
-        df_scored['final_score'] = df_scored['final_score'].round(2)
-        df_scored['academic_score'] = df_scored['academic_score'].round(2)
-        df_scored['financial_score'] = df_scored['financial_score'].round(2)
-        df_scored['engagement_score'] = df_scored['engagement_score'].round(2)
+        np.round(scores, 2, out=scores)
+        
+        df_scored['academic_score'] = scores[:, 0]
+        df_scored['financial_score'] = scores[:, 1]
+        df_scored['engagement_score'] = scores[:, 2]
+        df_scored['final_score'] = scores[:, 3]
         
         return df_scored
     
@@ -140,31 +220,27 @@ class ScholarshipDSS:
         - Score 60-79: Partial Scholarship
         - Score < 60: Not Eligible
         
+        Recommendation columns are added to `df_scored` in place rather
+        than copying the whole frame
+        
         Returns:
-            DataFrame with recommendation and amount
+            The same DataFrame, with recommendation and amount
         """
-        df_decision = df_scored.copy()
+        df_decision = df_scored
         
         # Apply decision rules
-        conditions = [
-            df_decision['final_score'] >= 80,
-            (df_decision['final_score'] >= 60) & (df_decision['final_score'] < 80),
-            df_decision['final_score'] < 60
-        ]
+        # Bucket each score once: 0 = Not Eligible, 1 = Partial, 2 = Full
+        final_score = df_decision['final_score'].to_numpy()
+        bucket = np.digitize(final_score, [60, 80])
+        bucket[np.isnan(final_score)] = 0
         
-        choices = ['Full Scholarship', 'Partial Scholarship', 'Not Eligible']
-        df_decision['recommendation'] = np.select(conditions, choices)
+        choices = np.array(['Not Eligible', 'Partial Scholarship', 'Full Scholarship'], dtype=object)
+        df_decision['recommendation'] = choices[bucket]
         
         # Calculate scholarship amount (based on typical tuition)
         # Full: $10,000, Partial: $5,000, None: $0
-        amount_conditions = [
-            df_decision['final_score'] >= 80,
-            (df_decision['final_score'] >= 60) & (df_decision['final_score'] < 80),
-            df_decision['final_score'] < 60
-        ]
-        
-        amount_choices = [10000, 5000, 0]
-        df_decision['scholarship_amount'] = np.select(amount_conditions, amount_choices)
+        amount_choices = np.array([0, 5000, 10000], dtype=np.int32)
+        df_decision['scholarship_amount'] = amount_choices[bucket]
         
         return df_decision
     
@@ -178,51 +254,98 @@ class ScholarshipDSS:
         Returns:
             Dictionary with explanation
         """
+        breakdown = {}
+        for category, (score_col, weight_attr, components) in self.EXPLANATION_BREAKDOWN.items():
+            weight = getattr(self, weight_attr)
+            breakdown[category] = {
+                'score': row[score_col],
+                'weight': f"{weight*100:.1f}%",
+                'contribution': row[score_col] * weight,
+                'components': {
+                    label: fmt.format(row[col]) if fmt else row[col]
+                    for label, (col, fmt) in components.items()
+                }
+            }
+        
         explanation = {
             'final_score': row['final_score'],
             'recommendation': row['recommendation'],
-            'breakdown': {
-                'Academic Merit': {
-                    'score': row['academic_score'],
-                    'weight': f"{self.academic_weight*100}%",
-                    'contribution': row['academic_score'] * self.academic_weight,
-                    'components': {
-                        'Performance Index': row['Performance Index'],
-                        'Previous Scores': row['Previous Scores']
-                    }
-                },
-                'Financial Need': {
-                    'score': row['financial_score'],
-                    'weight': f"{self.financial_weight*100}%",
-                    'contribution': row['financial_score'] * self.financial_weight,
-                    'components': {
-                        'Family Income': f"${row['family_income']:,}",
-                        'Parent Education': row['parent_education']
-                    }
-                },
-                'Engagement': {
-                    'score': row['engagement_score'],
-                    'weight': f"{self.engagement_weight*100}%",
-                    'contribution': row['engagement_score'] * self.engagement_weight,
-                    'components': {
-                        'Attendance': f"{row['attendance_percentage']}%",
-                        'Extracurriculars': row['Extracurricular Activities'],
-                        'Practice Papers': row['Sample Question Papers Practiced']
-                    }
-                }
-            }
+            'breakdown': breakdown
         }
         
         return explanation
     
-    def rank_applicants(self, df_decision):
+    def get_score_explanations(self, df_scored):
+        """
+        Generate explanations for every applicant at once
+        
+        Batched equivalent of get_score_explanation: columns are pulled out
+        once as plain lists instead of resolving labels row by row
+        
+        Args:
+            df_scored: Scored DataFrame with recommendations
+            
+        Returns:
+            List of explanation dictionaries, in row order
+        """
+        final_scores = df_scored['final_score'].tolist()
+        recommendations = df_scored['recommendation'].tolist()
+        
+        categories = []
+        for category, (score_col, weight_attr, components) in self.EXPLANATION_BREAKDOWN.items():
+            weight = getattr(self, weight_attr)
+            scores = df_scored[score_col]
+            component_values = []
+            for label, (col, fmt) in components.items():
+                values = df_scored[col].tolist()
+                component_values.append((label, [fmt.format(v) for v in values] if fmt else values))
+            categories.append((
+                category,
+                f"{weight*100:.1f}%",
+                scores.tolist(),
+                (scores.to_numpy() * weight).tolist(),
+                component_values
+            ))
+        
+        return [
+            {
+                'final_score': final_scores[i],
+                'recommendation': recommendations[i],
+                'breakdown': {
+                    category: {
+                        'score': scores[i],
+                        'weight': weight_label,
+                        'contribution': contributions[i],
+                        'components': {label: values[i] for label, values in component_values}
+                    }
+                    for category, weight_label, scores, contributions, component_values in categories
+                }
+            }
+            for i in range(len(df_scored))
+        ]
+    
+    def rank_applicants(self, df_decision, top_k=None):
         """
         Rank applicants by final score
         
+        Args:
+            df_decision: Scored DataFrame
+            top_k: If set, only rank and return the top_k applicants,
+                using a partial sort instead of sorting every row
+        
         Returns:
             Sorted DataFrame with rank column
         """
-        df_ranked = df_decision.sort_values('final_score', ascending=False).copy()
+        if top_k is None or top_k >= len(df_decision):
+            # sort_values already returns a new frame, no extra copy needed
+            df_ranked = df_decision.sort_values('final_score', ascending=False)
+        else:
+            top_k = max(top_k, 0)
+            scores = -df_decision['final_score'].to_numpy()
+            top_idx = np.argpartition(scores, top_k)[:top_k]
+            top_idx = top_idx[np.argsort(scores[top_idx], kind='stable')]
+            df_ranked = df_decision.iloc[top_idx].copy()
+        
         df_ranked['rank'] = range(1, len(df_ranked) + 1)
         
         return df_ranked
@@ -3,8 +3,12 @@ Streamlit App for Scholarship Decision Support System
 Interactive interface for scholarship allocation decisions
 """
 
+import hashlib
+
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 from data_processor import ScholarshipDataProcessor
@@ -17,11 +21,234 @@ st.set_page_config(
     layout="wide"
 )
 
+# Plot color of each recommendation, in display order
+REC_COLORS = {
+    'Full Scholarship': '#28a745',
+    'Partial Scholarship': '#ffc107',
+    'Not Eligible': '#dc3545'
+}
+
+# Max points per recommendation group drawn in the scatter plot
+SCATTER_POINTS_PER_GROUP = 700
+# Max points per recommendation group drawn in the violin plot
+VIOLIN_POINTS_PER_GROUP = 2000
+
+# Max rows styled with a background gradient in the rankings table
+STYLED_ROWS_LIMIT = 500
+
+# st.cache_data is shared by every session, so caches keyed on a ranking
+# (weights x thresholds) keep only this many recent entries
+RANKING_CACHE_ENTRIES = 32
+# Scored frames kept by score_and_rank, one per weight configuration
+SCORE_CACHE_ENTRIES = 4
+
 # Initialize session state
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
-    st.session_state.df_original = None
-    st.session_state.df_processed = None
+    st.session_state.df_processed_ipc = None
+
+def to_arrow_ipc(df):
+    """
+    Serialize a DataFrame to an Arrow IPC stream buffer
+    """
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def from_arrow_ipc(buffer):
+    """
+    Rebuild a DataFrame written by to_arrow_ipc
+    """
+    return pa.ipc.open_stream(buffer).read_pandas()
+
+@st.cache_data(show_spinner=False, max_entries=SCORE_CACHE_ENTRIES)
+def score_and_rank(_df_processed_ipc, file_hash, academic_weight, financial_weight, engagement_weight):
+    """
+    Score and rank the processed data for one weight configuration (in percent)
+    
+    Ranking does not depend on the thresholds, so this is only redone
+    when the data or the weights change. The leading underscore keeps
+    Streamlit from hashing the buffer, file_hash identifies the data
+    instead. The frame is only rebuilt from the buffer on a cache miss
+    """
+    dss = ScholarshipDSS(
+        academic_weight=academic_weight/100,
+        financial_weight=financial_weight/100,
+        engagement_weight=engagement_weight/100
+    )
+    df_scored = dss.calculate_final_score(from_arrow_ipc(_df_processed_ipc))
+    df_ranked = dss.rank_applicants(df_scored)
+    
+    # Scores, income and the categoricals already come out compact,
+    # only the rank column is still int64
+    df_ranked['rank'] = df_ranked['rank'].astype('int32')
+    
+    return df_ranked
+
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def assign_recommendation(_df_ranked, score_key, partial_threshold, full_threshold):
+    """
+    Add the recommendation column for the current thresholds
+    
+    score_key identifies the ranked frame: (file_hash, weights)
+    """
+    df_ranked = _df_ranked
+    
+    # Apply decision rules (simple, transparent, DSS-safe)
+    # Thresholds are minimum scores, as in ScholarshipDSS.apply_decision_rules
+    # Select codes into REC_COLORS and store them as a categorical rather
+    # than a string per applicant
+    final_score = df_ranked['final_score'].to_numpy()
+    rec_codes = np.select(
+        [final_score >= full_threshold, final_score >= partial_threshold],
+        [0, 1],
+        default=2
+    )
+    df_ranked['recommendation'] = pd.Categorical.from_codes(rec_codes, categories=list(REC_COLORS))
+    
+    return df_ranked
+
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def to_csv_bytes(_df_ranked, ranking_key):
+    """
+    Serialize the ranked results for download, once per ranking_key
+    """
+    return _df_ranked.to_csv(index=False).encode()
+
+@st.cache_resource(show_spinner=False, max_entries=SCORE_CACHE_ENTRIES)
+def explain_all(_dss, _df_ranked, score_key):
+    """
+    Score explanations of every applicant in the current ranking, in rank order
+    
+    Built once per score_key, so browsing applicants is a list lookup
+    instead of a get_score_explanation call each. Held as a resource so
+    a hit is not copied; treat the result as read-only. The recommendation
+    depends on the thresholds, so it is left out: read it from df_ranked
+    """
+    explanations = _dss.get_score_explanations(_df_ranked)
+    for explanation in explanations:
+        del explanation['recommendation']
+    
+    return explanations
+
+def sample_per_group(df_ranked, max_rows):
+    """
+    Stratified sample of at most max_rows applicants per recommendation
+    
+    Fixed seed so plotted points stay put across reruns
+    """
+    return df_ranked.groupby('recommendation', group_keys=False, observed=True).apply(
+        lambda g: g.sample(min(len(g), max_rows), random_state=42)
+    )
+
+# Figure builders are cached on ranking_key, (score_key, partial_threshold,
+# full_threshold), which identifies the ranked frame they are drawn from
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def build_score_histogram(_df_ranked, ranking_key):
+    """
+    Stacked final score histogram for the Overview tab
+    """
+    # Bin and count every group in one crosstab, only the counts reach the browser
+    # Bins are left-closed so the 60 and 80 thresholds each start a bin,
+    # the last one is left open so a perfect 100 is still counted
+    score_edges = np.linspace(0, 100, 31)
+    score_bins = pd.cut(_df_ranked['final_score'], [*score_edges[:-1], np.inf], right=False)
+    counts = pd.crosstab(score_bins, _df_ranked['recommendation']).reindex(
+        index=score_bins.cat.categories, columns=list(REC_COLORS), fill_value=0
+    )
+    fig_dist = go.Figure()
+    for rec, color in REC_COLORS.items():
+        fig_dist.add_bar(
+            x=(score_edges[:-1] + score_edges[1:]) / 2,
+            y=counts[rec].to_numpy(),
+            width=np.diff(score_edges),
+            name=rec,
+            marker_color=color
+        )
+    fig_dist.update_layout(
+        barmode='stack',
+        bargap=0,
+        title='Final Score Distribution by Recommendation',
+        xaxis_title='Final Score',
+        yaxis_title='Number of Applicants'
+    )
+    
+    return fig_dist
+
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def build_score_scatter(_df_ranked, ranking_key):
+    """
+    Academic vs financial scatter for the Visualizations tab
+    """
+    # Stratified sample keeps every group visible at a plottable size
+    df_scatter = sample_per_group(_df_ranked, SCATTER_POINTS_PER_GROUP)
+    fig_scatter = px.scatter(
+        df_scatter,
+        x='academic_score',
+        y='financial_score',
+        color='recommendation',
+        size='engagement_score',
+        hover_data=['rank', 'final_score'],
+        title='Academic Merit vs Financial Need',
+        render_mode='webgl',
+        color_discrete_map=REC_COLORS,
+        category_orders={'recommendation': list(REC_COLORS)}
+    )
+    fig_scatter.update_layout(hovermode='closest')
+    
+    return fig_scatter
+
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def build_income_box(_df_ranked, ranking_key):
+    """
+    Family income box plot for the Visualizations tab
+    """
+    # Send five summary values per group instead of every applicant
+    income_stats = _df_ranked.groupby('recommendation', observed=True)['family_income'].describe()
+    fig_income = go.Figure()
+    for rec, color in REC_COLORS.items():
+        if rec not in income_stats.index:
+            continue
+        stats = income_stats.loc[rec]
+        fig_income.add_trace(go.Box(
+            x=[rec],
+            q1=[stats['25%']],
+            median=[stats['50%']],
+            q3=[stats['75%']],
+            lowerfence=[stats['min']],
+            upperfence=[stats['max']],
+            name=rec,
+            marker_color=color
+        ))
+    fig_income.update_layout(
+        title='Family Income by Scholarship Type',
+        xaxis_title='recommendation',
+        yaxis_title='family_income'
+    )
+    
+    return fig_income
+
+@st.cache_data(show_spinner=False, max_entries=RANKING_CACHE_ENTRIES)
+def build_performance_violin(_df_ranked, ranking_key):
+    """
+    Performance Index violin plot for the Visualizations tab
+    """
+    # Violins need raw samples for the density estimate, so cap each
+    # group with a stratified sample rather than aggregating
+    fig_performance = px.violin(
+        sample_per_group(_df_ranked, VIOLIN_POINTS_PER_GROUP),
+        x='recommendation',
+        y='Performance Index',
+        color='recommendation',
+        box=True,
+        title='Performance Index Distribution',
+        color_discrete_map=REC_COLORS,
+        category_orders={'recommendation': list(REC_COLORS)}
+    )
+    
+    return fig_performance
 
 def main():
     st.title("🎓 Scholarship Allocation Decision Support System")
@@ -102,19 +329,18 @@ def main():
     # Main content
     if uploaded_file is not None:
         # Load and process data
-        if not st.session_state.data_loaded or uploaded_file != st.session_state.get('last_file'):
+        # file_id tells uploads apart without reading them; the content is
+        # only hashed when a new upload is loaded
+        if not st.session_state.data_loaded or uploaded_file.file_id != st.session_state.get('last_file_id'):
             with st.spinner("Loading and enhancing dataset..."):
                 processor = ScholarshipDataProcessor()
-                df_enhanced = processor.load_and_enhance_data(uploaded_file)
-                df_processed = processor.preprocess_data(df_enhanced)
+                df_processed = processor.enhance_and_preprocess(uploaded_file)
                 
-                st.session_state.df_original = df_enhanced
-                st.session_state.df_processed = df_processed
+                # Keep the processed data as a compact, immutable Arrow buffer
+                st.session_state.df_processed_ipc = to_arrow_ipc(df_processed)
+                st.session_state.file_hash = hashlib.md5(uploaded_file.getvalue()).hexdigest()
                 st.session_state.data_loaded = True
-                st.session_state.last_file = uploaded_file
-        
-        df_processed = st.session_state.df_processed
-        df_original = st.session_state.df_original
+                st.session_state.last_file_id = uploaded_file.file_id
         
         # Calculate scores with current weights
         if total_weight == 100:
@@ -124,77 +350,61 @@ def main():
                 engagement_weight=engagement_weight/100
             )
             
-            df_scored = dss.calculate_final_score(df_processed)
-            
-            # Apply decision rules (simple, transparent, DSS-safe)
-            df_scored['recommendation'] = pd.cut(
-                df_scored['final_score'],
-                bins=[0, partial_threshold, full_threshold, 100],
-                labels=['Not Eligible', 'Partial Scholarship', 'Full Scholarship'],
-                include_lowest=True
-                )
-
-
-            
-            # Simpler approach
-            df_scored['recommendation'] = pd.cut(
-                df_scored['final_score'],
-                bins=[0, partial_threshold, full_threshold, 100],
-                labels=['Not Eligible', 'Partial Scholarship', 'Full Scholarship'],
-                include_lowest=True
-            )
-            
-            df_ranked = dss.rank_applicants(df_scored)
+            # Scores and ranks only change with the data or the weights, and
+            # the recommendation only with the thresholds: reuse cached results
+            weights = (academic_weight, financial_weight, engagement_weight)
+            score_key = (st.session_state.file_hash, *weights)
+            df_ranked = score_and_rank(st.session_state.df_processed_ipc, *score_key)
+            df_ranked = assign_recommendation(df_ranked, score_key, partial_threshold, full_threshold)
+            ranking_key = (score_key, partial_threshold, full_threshold)
             
             # Display results
-            tabs = st.tabs([
+            # st.tabs would build every tab on each rerun, so only the
+            # selected view is rendered
+            tabs = [
                 "📊 Overview",
                 "👥 Applicant Rankings", 
                 "🔍 Individual Analysis",
                 "📈 Visualizations",
                 "ℹ️ System Explanation"
-            ])
+            ]
+            active_tab = st.radio(
+                "View",
+                tabs,
+                key='active_tab',
+                horizontal=True,
+                label_visibility='collapsed'
+            )
             
-            with tabs[0]:
+            if active_tab == tabs[0]:
                 st.header("📊 Scholarship Allocation Overview")
                 
                 # Summary metrics
                 col1, col2, col3, col4 = st.columns(4)
+                recommendation_counts = df_ranked['recommendation'].value_counts()
                 
                 with col1:
                     total_applicants = len(df_ranked)
                     st.metric("Total Applicants", total_applicants)
                 
                 with col2:
-                    full_count = len(df_ranked[df_ranked['recommendation'] == 'Full Scholarship'])
+                    full_count = recommendation_counts.get('Full Scholarship', 0)
                     st.metric("Full Scholarships", full_count, f"{full_count/total_applicants*100:.1f}%")
                 
                 with col3:
-                    partial_count = len(df_ranked[df_ranked['recommendation'] == 'Partial Scholarship'])
+                    partial_count = recommendation_counts.get('Partial Scholarship', 0)
                     st.metric("Partial Scholarships", partial_count, f"{partial_count/total_applicants*100:.1f}%")
                 
                 with col4:
-                    not_eligible = len(df_ranked[df_ranked['recommendation'] == 'Not Eligible'])
+                    not_eligible = recommendation_counts.get('Not Eligible', 0)
                     st.metric("Not Eligible", not_eligible, f"{not_eligible/total_applicants*100:.1f}%")
                 
                 # Score distribution
                 st.subheader("Score Distribution")
-                fig_dist = px.histogram(
-                    df_ranked,
-                    x='final_score',
-                    nbins=30,
-                    color='recommendation',
-                    title='Final Score Distribution by Recommendation',
-                    labels={'final_score': 'Final Score', 'count': 'Number of Applicants'},
-                    color_discrete_map={
-                        'Full Scholarship': '#28a745',
-                        'Partial Scholarship': '#ffc107',
-                        'Not Eligible': '#dc3545'
-                    }
-                )
+                fig_dist = build_score_histogram(df_ranked, ranking_key)
                 st.plotly_chart(fig_dist, use_container_width=True)
             
-            with tabs[1]:
+            if active_tab == tabs[1]:
                 st.header("👥 Applicant Rankings")
                 
                 # Filter options
@@ -202,16 +412,14 @@ def main():
                 with col1:
                     recommendation_filter = st.multiselect(
                         "Filter by Recommendation",
-                        options=['Full Scholarship', 'Partial Scholarship', 'Not Eligible'],
-                        default=['Full Scholarship', 'Partial Scholarship', 'Not Eligible']
+                        options=list(REC_COLORS),
+                        default=list(REC_COLORS)
                     )
                 
                 with col2:
                     top_n = st.slider("Show top N applicants", 10, len(df_ranked), 50)
                 
                 # Display filtered rankings
-                df_display = df_ranked[df_ranked['recommendation'].isin(recommendation_filter)].head(top_n)
-                
                 display_columns = [
                     'rank', 'final_score', 'recommendation',
                     'academic_score', 'financial_score', 'engagement_score',
@@ -219,17 +427,36 @@ def main():
                     'parent_education', 'attendance_percentage',
                     'Extracurricular Activities'
                 ]
-                
-                st.dataframe(
-                    df_display[display_columns].style.background_gradient(
-                        subset=['final_score', 'academic_score', 'financial_score', 'engagement_score'],
-                        cmap='RdYlGn'
-                    ),
-                    height=600
-                )
+                score_columns = ['final_score', 'academic_score', 'financial_score', 'engagement_score']
+                
+                # Project columns before slicing so only displayed cells get styled
+                df_display = df_ranked.loc[
+                    df_ranked['recommendation'].isin(recommendation_filter), display_columns
+                ].head(top_n)
+                
+                if len(df_display) <= STYLED_ROWS_LIMIT:
+                    st.dataframe(
+                        df_display.style.background_gradient(
+                            subset=score_columns,
+                            cmap='RdYlGn'
+                        ),
+                        height=600
+                    )
+                else:
+                    # Styler does not scale to large tables, show scores as bars instead
+                    st.dataframe(
+                        df_display,
+                        column_config={
+                            col: st.column_config.ProgressColumn(
+                                col, min_value=0, max_value=100, format="%.2f"
+                            )
+                            for col in score_columns
+                        },
+                        height=600
+                    )
                 
                 # Download option
-                csv = df_ranked.to_csv(index=False)
+                csv = to_csv_bytes(df_ranked, ranking_key)
                 st.download_button(
                     label="📥 Download Full Results",
                     data=csv,
@@ -237,62 +464,40 @@ def main():
                     mime="text/csv"
                 )
             
-            with tabs[2]:
+            if active_tab == tabs[2]:
                 st.header("🔍 Individual Applicant Analysis")
                 
                 # Select applicant
                 applicant_id = st.selectbox(
                     "Select Applicant (by Rank)",
-                    options=df_ranked['rank'].tolist(),
+                    options=range(1, len(df_ranked) + 1),
                     format_func=lambda x: f"Rank #{x}"
                 )
                 
-                applicant_row = df_ranked[df_ranked['rank'] == applicant_id].iloc[0]
-                explanation = dss.get_score_explanation(applicant_row)
+                # Explanations are in rank order, so rank N is at position N - 1
+                explanation = explain_all(dss, df_ranked, score_key)[applicant_id - 1]
                 
                 # Display recommendation
-                st.subheader(f"Recommendation: {explanation['recommendation']}")
+                st.subheader(f"Recommendation: {df_ranked['recommendation'].iat[applicant_id - 1]}")
                 st.metric("Final Score", f"{explanation['final_score']:.2f}/100")
                 
                 # Score breakdown
                 st.subheader("Score Breakdown")
                 
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown("**Academic Merit**")
-                    st.metric("Score", f"{explanation['breakdown']['Academic Merit']['score']:.2f}")
-                    st.write(f"Weight: {explanation['breakdown']['Academic Merit']['weight']}")
-                    st.write(f"Contribution: {explanation['breakdown']['Academic Merit']['contribution']:.2f}")
-                    with st.expander("Components"):
-                        for k, v in explanation['breakdown']['Academic Merit']['components'].items():
-                            st.write(f"- {k}: {v}")
-                
-                with col2:
-                    st.markdown("**Financial Need**")
-                    st.metric("Score", f"{explanation['breakdown']['Financial Need']['score']:.2f}")
-                    st.write(f"Weight: {explanation['breakdown']['Financial Need']['weight']}")
-                    st.write(f"Contribution: {explanation['breakdown']['Financial Need']['contribution']:.2f}")
-                    with st.expander("Components"):
-                        for k, v in explanation['breakdown']['Financial Need']['components'].items():
-                            st.write(f"- {k}: {v}")
-                
-                with col3:
-                    st.markdown("**Engagement**")
-                    st.metric("Score", f"{explanation['breakdown']['Engagement']['score']:.2f}")
-                    st.write(f"Weight: {explanation['breakdown']['Engagement']['weight']}")
-                    st.write(f"Contribution: {explanation['breakdown']['Engagement']['contribution']:.2f}")
-                    with st.expander("Components"):
-                        for k, v in explanation['breakdown']['Engagement']['components'].items():
-                            st.write(f"- {k}: {v}")
+                breakdown = explanation['breakdown']
+                for col, (category, details) in zip(st.columns(3), breakdown.items()):
+                    with col:
+                        st.markdown(f"**{category}**")
+                        st.metric("Score", f"{details['score']:.2f}")
+                        st.write(f"Weight: {details['weight']}")
+                        st.write(f"Contribution: {details['contribution']:.2f}")
+                        with st.expander("Components"):
+                            for k, v in details['components'].items():
+                                st.write(f"- {k}: {v}")
                 
                 # Visualization
                 categories = ['Academic\nMerit', 'Financial\nNeed', 'Engagement']
-                contributions = [
-                    explanation['breakdown']['Academic Merit']['contribution'],
-                    explanation['breakdown']['Financial Need']['contribution'],
-                    explanation['breakdown']['Engagement']['contribution']
-                ]
+                contributions = [details['contribution'] for details in breakdown.values()]
                 
                 fig_contribution = go.Figure(data=[
                     go.Bar(
@@ -308,61 +513,25 @@ def main():
                 )
                 st.plotly_chart(fig_contribution, use_container_width=True)
             
-            with tabs[3]:
+            if active_tab == tabs[3]:
                 st.header("📈 System Visualizations")
                 
                 # 1. Score components scatter
                 st.subheader("Academic vs Financial Scores")
-                fig_scatter = px.scatter(
-                    df_ranked,
-                    x='academic_score',
-                    y='financial_score',
-                    color='recommendation',
-                    size='engagement_score',
-                    hover_data=['rank', 'final_score'],
-                    title='Academic Merit vs Financial Need',
-                    color_discrete_map={
-                        'Full Scholarship': '#28a745',
-                        'Partial Scholarship': '#ffc107',
-                        'Not Eligible': '#dc3545'
-                    }
-                )
+                fig_scatter = build_score_scatter(df_ranked, ranking_key)
                 st.plotly_chart(fig_scatter, use_container_width=True)
                 
                 # 2. Income vs Recommendation
                 st.subheader("Income Distribution by Recommendation")
-                fig_income = px.box(
-                    df_ranked,
-                    x='recommendation',
-                    y='family_income',
-                    color='recommendation',
-                    title='Family Income by Scholarship Type',
-                    color_discrete_map={
-                        'Full Scholarship': '#28a745',
-                        'Partial Scholarship': '#ffc107',
-                        'Not Eligible': '#dc3545'
-                    }
-                )
+                fig_income = build_income_box(df_ranked, ranking_key)
                 st.plotly_chart(fig_income, use_container_width=True)
                 
                 # 3. Performance distribution
                 st.subheader("Performance Index by Recommendation")
-                fig_performance = px.violin(
-                    df_ranked,
-                    x='recommendation',
-                    y='Performance Index',
-                    color='recommendation',
-                    box=True,
-                    title='Performance Index Distribution',
-                    color_discrete_map={
-                        'Full Scholarship': '#28a745',
-                        'Partial Scholarship': '#ffc107',
-                        'Not Eligible': '#dc3545'
-                    }
-                )
+                fig_performance = build_performance_violin(df_ranked, ranking_key)
                 st.plotly_chart(fig_performance, use_container_width=True)
             
-            with tabs[4]:
+            if active_tab == tabs[4]:
                 st.header("ℹ️ System Explanation")
                 
                 st.markdown("""